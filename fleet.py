@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Fleet mode: generate HTML reports for many teams' context files in one run
+Parses context files in a process pool, schedules all model requests through
+one async queue with a concurrency cap, and writes each report atomically
+"""
+
+import os
+import sys
+import glob
+import time
+import asyncio
+import argparse
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from main import (
+    GeminiError,
+    get_api_key,
+    read_context_file,
+    call_gemini_requests,
+    call_gemini_genai,
+    import_genai,
+)
+
+DEFAULT_PATTERN = os.path.join('*', 'context.txt')
+DEFAULT_REQUEST_TIMEOUT = 120
+
+
+def find_context_files(sources: List[str], pattern: str = DEFAULT_PATTERN) -> List[str]:
+    """Expand directories (using pattern) and glob patterns into a sorted list of context files"""
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, pattern))
+        else:
+            matches = glob.glob(source)
+        files.extend(m for m in matches if os.path.isfile(m))
+    return sorted(set(os.path.abspath(f) for f in files))
+
+
+def team_name(context_file: str) -> str:
+    """Derive the team name from a context file path"""
+    stem = os.path.splitext(os.path.basename(context_file))[0]
+    if stem == 'context':
+        # teams/<team>/context.txt layout
+        return os.path.basename(os.path.dirname(context_file)) or stem
+    return stem
+
+
+def assign_team_names(context_files: List[str]) -> Dict[str, str]:
+    """Map each context file to a unique team name
+
+    Files whose team names collide are named after their path relative to the
+    common directory of all inputs instead, so 2025-05/alpha.txt and
+    2025-06/alpha/context.txt become 2025-05_alpha and 2025-06_alpha. If that
+    still collides, the file stem is kept (alpha.txt and alpha/context.txt
+    become alpha and alpha_context). Raises ValueError if the names still collide.
+    """
+    names = {f: team_name(f) for f in context_files}
+    root = os.path.commonpath([os.path.dirname(f) for f in context_files]) if context_files else ''
+
+    def relative_name(context_file: str, keep_stem: bool) -> str:
+        relative = os.path.splitext(os.path.relpath(context_file, root))[0]
+        if not keep_stem and os.path.basename(relative) == 'context':
+            relative = os.path.dirname(relative) or relative
+        return relative.replace(os.sep, '_')
+
+    for keep_stem in (False, True):
+        counts: Dict[str, int] = {}
+        for name in names.values():
+            counts[name] = counts.get(name, 0) + 1
+        for f, name in names.items():
+            if counts[name] > 1:
+                names[f] = relative_name(f, keep_stem)
+
+    seen: Dict[str, str] = {}
+    for f, name in names.items():
+        if name in seen:
+            raise ValueError(f"team name '{name}' is shared by {seen[name]} and {f}")
+        seen[name] = f
+    return names
+
+
+def parse_context_file(context_file: str) -> Tuple[str, Optional[str], float]:
+    """Read one context file (runs in a worker process) and return its timing"""
+    start = time.perf_counter()
+    context = read_context_file(context_file)
+    if context is not None and not context.strip():
+        context = None
+    return context_file, context, time.perf_counter() - start
+
+
+def _current_umask() -> int:
+    """Return the process umask without changing it"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_report_atomic(path: str, html: str, mode: int) -> None:
+    """Write the report to a temp file in the same directory, then rename it into place
+
+    mkstemp creates the file as 0600, so a new report gets mode instead and an
+    existing report keeps its own mode.
+    """
+    directory = os.path.dirname(path) or '.'
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        pass
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(html)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def redact(text: str, api_key: str) -> str:
+    """Remove the API key from an error message"""
+    # Short keys would match ordinary words; the URL form is covered by the regex
+    if api_key and len(api_key) >= 8:
+        text = text.replace(api_key, '***')
+    return re.sub(r'key=[^&\s)]+', 'key=***', text)
+
+
+def describe_error(error: BaseException, api_key: str) -> str:
+    """Format a backend exception for the summary, without the API key"""
+    if isinstance(error, GeminiError):
+        message = str(error)
+    else:
+        message = f"{type(error).__name__}: {error}"
+    return redact(message, api_key)
+
+
+async def run_fleet(context_files: List[str], output_dir: str, api_key: str,
+                    concurrency: int, parse_workers: Optional[int], use_requests: bool,
+                    team_names: Optional[Dict[str, str]] = None,
+                    request_timeout: float = DEFAULT_REQUEST_TIMEOUT) -> List[Dict]:
+    """Parse all context files and generate one report per team"""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    results: List[Dict] = []
+    call = call_gemini_requests if use_requests else call_gemini_genai
+    if team_names is None:
+        team_names = assign_team_names(context_files)
+    os.makedirs(output_dir, exist_ok=True)
+    # Read the umask before any request thread starts, since reading it briefly changes it
+    report_mode = 0o666 & ~_current_umask()
+
+    def generate(context: str) -> str:
+        # The backend timeout stops the thread; wait_for below is the backstop
+        return call(None, api_key, context, use_system_instruction=True, timeout=request_timeout)
+
+    # The model clients are blocking, so each queue worker gets its own thread
+    request_pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def parse(parse_pool: ProcessPoolExecutor, context_file: str) -> None:
+        try:
+            _, context, parse_time = await loop.run_in_executor(parse_pool, parse_context_file, context_file)
+            error = None
+        except Exception as e:
+            context, parse_time = None, 0.0
+            error = f"parse failed: {e!r}"
+        await queue.put((context_file, context, parse_time, error))
+
+    async def worker() -> None:
+        while True:
+            context_file, context, parse_time, error = await queue.get()
+            team = team_names[context_file]
+            result = {'team': team, 'file': context_file, 'parse_time': parse_time,
+                      'request_time': 0.0, 'output': None, 'error': error}
+            try:
+                if error is not None:
+                    continue
+                if context is None:
+                    result['error'] = 'context file empty or unreadable'
+                    continue
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(
+                        loop.run_in_executor(request_pool, generate, context), request_timeout)
+                except asyncio.TimeoutError:
+                    result['error'] = f"request timed out after {request_timeout:g}s"
+                    continue
+                except Exception as e:
+                    result['error'] = describe_error(e, api_key)
+                    continue
+                finally:
+                    result['request_time'] = time.perf_counter() - start
+                if not response:
+                    result['error'] = 'empty response from AI'
+                    continue
+                output = os.path.join(output_dir, f"{team}.html")
+                write_report_atomic(output, response, report_mode)
+                result['output'] = output
+                print(f"[{team}] report written to {output}", file=sys.stderr)
+            except Exception as e:
+                result['error'] = describe_error(e, api_key)
+            finally:
+                if result['error']:
+                    print(f"[{team}] Error: {result['error']}", file=sys.stderr)
+                results.append(result)
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+            await asyncio.gather(*(parse(parse_pool, f) for f in context_files))
+        await queue.join()
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        request_pool.shutdown(wait=False)
+    return results
+
+
+def print_summary(results: List[Dict], elapsed: float) -> None:
+    """Print per-team timing and failures"""
+    print("\n" + "="*50)
+    print("Fleet Summary:")
+    print("="*50)
+    width = max([len(r['team']) for r in results] + [4])
+    print(f"{'Team':<{width}}  {'Parse':>8}  {'Request':>8}  Status")
+    for r in sorted(results, key=lambda r: r['team']):
+        status = 'ok' if r['error'] is None else f"FAILED: {r['error']}"
+        print(f"{r['team']:<{width}}  {r['parse_time']:>7.2f}s  {r['request_time']:>7.2f}s  {status}")
+    failed = sum(1 for r in results if r['error'] is not None)
+    print(f"\n{len(results) - failed} succeeded, {failed} failed in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ai-py fleet: generate HTML reports for many teams' context files")
+    parser.add_argument('sources', nargs='+', help='Directories or glob patterns of team context files')
+    parser.add_argument('--pattern', type=str, default=DEFAULT_PATTERN, help=f'Glob used to find context files inside directory sources (default: {DEFAULT_PATTERN})')
+    parser.add_argument('--output-dir', type=str, default='reports', help='Directory to write <team>.html reports to (default: reports)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum number of model requests in flight (default: 8)')
+    parser.add_argument('--parse-workers', type=int, default=None, help='Number of processes used to parse context files (default: CPU count)')
+    parser.add_argument('--request-timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT, help=f'Seconds before a model request is counted as failed (default: {DEFAULT_REQUEST_TIMEOUT})')
+    parser.add_argument('--use-requests', action='store_true', help='Use the Gemini REST API via requests instead of google-generativeai (same as main.py without --use-genai)')
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if args.parse_workers is not None and args.parse_workers < 1:
+        print("Error: --parse-workers must be at least 1", file=sys.stderr)
+        sys.exit(1)
+    if args.request_timeout <= 0:
+        print("Error: --request-timeout must be greater than 0", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.use_requests:
+        # Fail once up front rather than once per team
+        try:
+            import_genai()
+        except GeminiError as e:
+            print(f"Error: {e} (or pass --use-requests)", file=sys.stderr)
+            sys.exit(1)
+
+    api_key = get_api_key()
+    if not api_key:
+        sys.exit(1)
+
+    context_files = find_context_files(args.sources, args.pattern)
+    if not context_files:
+        print("Error: no context files found", file=sys.stderr)
+        sys.exit(1)
+    try:
+        team_names = assign_team_names(context_files)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Generating reports for {len(context_files)} team(s)...", file=sys.stderr)
+
+    start = time.perf_counter()
+    results = asyncio.run(run_fleet(context_files, args.output_dir, api_key,
+                                    args.concurrency, args.parse_workers, args.use_requests,
+                                    team_names, args.request_timeout))
+    print_summary(results, time.perf_counter() - start)
+
+    if any(r['error'] is not None for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -40,23 +40,29 @@ def read_context_file(context_file: str) -> Optional[str]:
         return None
 
 
-def send_prompt_to_gemini_requests(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False) -> Optional[str]:
-    """Send a prompt to the Gemini API using requests and return the response"""
+SYSTEM_INSTRUCTION = (
+    "You are an experienced psychologist, helping businesses understand their employees' behavior in terms of work and productivity. "
+    "You are also an experienced project manager in the software development field for a long time, providing consultations on how to make software teams more productive. "
+    "Also, you have a knack on word puzzles, text pattern analysis, and forensic level of information extraction from seemingly difficult to understand texts from different sources. "
+    "You can speak and understand both English and Japanese, but you prefer to use English for your responses. "
+    "For each team member, summarize their activities in a narrative, paragraph-style format. Do not use bullet points or lists for activities; instead, aggregate and describe each member's activities as a short story or paragraph. "
+    "Keep the breakdown by team member, but make each activity summary flow naturally. Do not mention anything about your expertise, just provide the summary based on the context provided. "
+    "Respond in a neutral tone, without any personal opinions or biases. Do not use any emojis in your response. "
+    "Do not address your response to the user themselves, but to someone else generic. The generated report must be in HTML do not use markdown or plain text formatting. Don't include a header."
+)
+
+
+class GeminiError(Exception):
+    """Raised when a Gemini backend cannot produce a response"""
+
+
+def call_gemini_requests(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False, timeout: float = 30) -> str:
+    """Send a prompt to the Gemini API using requests and return the response, raising on failure"""
     url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-001:generateContent?key={api_key}"
-    system_instruction = (
-        "You are an experienced psychologist, helping businesses understand their employees' behavior in terms of work and productivity. "
-        "You are also an experienced project manager in the software development field for a long time, providing consultations on how to make software teams more productive. "
-        "Also, you have a knack on word puzzles, text pattern analysis, and forensic level of information extraction from seemingly difficult to understand texts from different sources. "
-        "You can speak and understand both English and Japanese, but you prefer to use English for your responses. "
-        "For each team member, summarize their activities in a narrative, paragraph-style format. Do not use bullet points or lists for activities; instead, aggregate and describe each member's activities as a short story or paragraph. "
-        "Keep the breakdown by team member, but make each activity summary flow naturally. Do not mention anything about your expertise, just provide the summary based on the context provided. "
-        "Respond in a neutral tone, without any personal opinions or biases. Do not use any emojis in your response. "
-        "Do not address your response to the user themselves, but to someone else generic. The generated report must be in HTML do not use markdown or plain text formatting. Don't include a header."
-    )
     if use_system_instruction:
         # REST API: system instruction and context as separate messages, only 'parts' (no 'role')
         contents = []
-        contents.append({"parts": [{"text": system_instruction}]})
+        contents.append({"parts": [{"text": SYSTEM_INSTRUCTION}]})
         if context:
             contents.append({"parts": [{"text": context}]})
         payload = {
@@ -79,15 +85,19 @@ def send_prompt_to_gemini_requests(prompt: str, api_key: str, context: str = Non
     headers = {
         "Content-Type": "application/json"
     }
+    response = requests.post(url, json=payload, headers=headers, timeout=timeout)
+    response.raise_for_status() 
+    data = response.json()
+    if 'candidates' in data and len(data['candidates']) > 0:
+        if 'content' in data['candidates'][0] and 'parts' in data['candidates'][0]['content']:
+            return data['candidates'][0]['content']['parts'][0]['text']
+    raise GeminiError("Unexpected response format from API")
+
+
+def send_prompt_to_gemini_requests(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False) -> Optional[str]:
+    """Send a prompt to the Gemini API using requests and return the response"""
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
-        response.raise_for_status() 
-        data = response.json()
-        if 'candidates' in data and len(data['candidates']) > 0:
-            if 'content' in data['candidates'][0] and 'parts' in data['candidates'][0]['content']:
-                return data['candidates'][0]['content']['parts'][0]['text']
-        print("Error: Unexpected response format from API", file=sys.stderr)
-        return None
+        return call_gemini_requests(prompt, api_key, context, use_system_instruction=use_system_instruction)
     except requests.exceptions.RequestException as e:
         print(f"Error making request to Gemini API: {e}", file=sys.stderr)
         return None
@@ -97,47 +107,54 @@ def send_prompt_to_gemini_requests(prompt: str, api_key: str, context: str = Non
     except KeyError as e:
         print(f"Error: Missing key in response: {e}", file=sys.stderr)
         return None
+    except GeminiError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return None
 
 
-def send_prompt_to_gemini_genai(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False) -> Optional[str]:
-    """Send a prompt to the Gemini API using google-generativeai (best practice) and return the response"""
+def import_genai():
+    """Import google-generativeai, raising GeminiError if it is not installed"""
     try:
         import google.generativeai as genai
     except ImportError:
-        print("Error: google-generativeai package is not installed. Please install it with 'pip install google-generativeai'", file=sys.stderr)
-        return None
+        raise GeminiError("google-generativeai package is not installed. Please install it with 'pip install google-generativeai'")
+    return genai
+
 
+def call_gemini_genai(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False, timeout: Optional[float] = None) -> str:
+    """Send a prompt to the Gemini API using google-generativeai and return the response, raising on failure"""
+    genai = import_genai()
     genai.configure(api_key=api_key)
 
-    system_instruction = (
-        "You are an experienced psychologist, helping businesses understand their employees' behavior in terms of work and productivity. "
-        "You are also an experienced project manager in the software development field for a long time, providing consultations on how to make software teams more productive. "
-        "Also, you have a knack on word puzzles, text pattern analysis, and forensic level of information extraction from seemingly difficult to understand texts from different sources. "
-        "You can speak and understand both English and Japanese, but you prefer to use English for your responses. "
-        "For each team member, summarize their activities in a narrative, paragraph-style format. Do not use bullet points or lists for activities; instead, aggregate and describe each member's activities as a short story or paragraph. "
-        "Keep the breakdown by team member, but make each activity summary flow naturally. Do not mention anything about your expertise, just provide the summary based on the context provided. "
-        "Respond in a neutral tone, without any personal opinions or biases. Do not use any emojis in your response. "
-        "Do not address your response to the user themselves, but to someone else generic. The generated report must be in HTML do not use markdown or plain text formatting. Don't include a header."
+    model = genai.GenerativeModel(
+        model_name="gemini-2.0-flash-001",
+        system_instruction=SYSTEM_INSTRUCTION if use_system_instruction else None
     )
-    try:
-        model = genai.GenerativeModel(
-            model_name="gemini-2.0-flash-001",
-            system_instruction=system_instruction if use_system_instruction else None
-        )
 
-        full_prompt = []
-        if context:
-            full_prompt.append("Context:\n" + context)
-        if prompt:
-            full_prompt.append(prompt)
-        final_content = "\n\n".join(full_prompt)
+    full_prompt = []
+    if context:
+        full_prompt.append("Context:\n" + context)
+    if prompt:
+        full_prompt.append(prompt)
+    final_content = "\n\n".join(full_prompt)
 
+    if timeout is not None:
+        response = model.generate_content(final_content, request_options={"timeout": timeout})
+    else:
         response = model.generate_content(final_content)
-        if hasattr(response, 'text'):
-            return response.text
-        if hasattr(response, 'result'):
-            return str(response.result)
-        print("Error: Unexpected response format from genai GenerativeModel API", file=sys.stderr)
+    if hasattr(response, 'text'):
+        return response.text
+    if hasattr(response, 'result'):
+        return str(response.result)
+    raise GeminiError("Unexpected response format from genai GenerativeModel API")
+
+
+def send_prompt_to_gemini_genai(prompt: str, api_key: str, context: str = None, use_system_instruction: bool = False) -> Optional[str]:
+    """Send a prompt to the Gemini API using google-generativeai (best practice) and return the response"""
+    try:
+        return call_gemini_genai(prompt, api_key, context, use_system_instruction=use_system_instruction)
+    except GeminiError as e:
+        print(f"Error: {e}", file=sys.stderr)
         return None
     except Exception as e:
         print(f"Error using google-generativeai GenerativeModel API: {e}", file=sys.stderr)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for fleet.py (run with: python -m pytest test_fleet.py)
+"""
+
+import os
+import asyncio
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import fleet
+
+
+def write(path, text='context'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return str(path)
+
+
+def test_find_context_files_directory_uses_pattern(tmp_path):
+    alpha = write(tmp_path / 'alpha' / 'context.txt')
+    write(tmp_path / 'README.txt')
+    write(tmp_path / 'notes.txt')
+    assert fleet.find_context_files([str(tmp_path)]) == [alpha]
+    assert len(fleet.find_context_files([str(tmp_path)], pattern='*.txt')) == 2
+
+
+def test_find_context_files_glob_and_dedupe(tmp_path):
+    alpha = write(tmp_path / 'alpha' / 'context.txt')
+    beta = write(tmp_path / 'beta' / 'context.txt')
+    sources = [str(tmp_path / '*' / 'context.txt'), str(tmp_path)]
+    assert fleet.find_context_files(sources) == [alpha, beta]
+
+
+def test_team_name():
+    assert fleet.team_name('/x/teams/alpha/context.txt') == 'alpha'
+    assert fleet.team_name('/x/exports/beta.txt') == 'beta'
+
+
+def test_assign_team_names_disambiguates_collisions(tmp_path):
+    may = write(tmp_path / 'exports' / '2025-05' / 'alpha.txt')
+    june = write(tmp_path / 'exports' / '2025-06' / 'alpha.txt')
+    beta = write(tmp_path / 'exports' / '2025-06' / 'beta.txt')
+    names = fleet.assign_team_names([may, june, beta])
+    assert names == {may: '2025-05_alpha', june: '2025-06_alpha', beta: 'beta'}
+
+
+def test_assign_team_names_disambiguates_team_directories(tmp_path):
+    may = write(tmp_path / 'exports' / '2025-05' / 'alpha' / 'context.txt')
+    june = write(tmp_path / 'exports' / '2025-06' / 'alpha' / 'context.txt')
+    beta = write(tmp_path / 'exports' / '2025-06' / 'beta' / 'context.txt')
+    names = fleet.assign_team_names([may, june, beta])
+    assert names == {may: '2025-05_alpha', june: '2025-06_alpha', beta: 'beta'}
+
+
+def test_assign_team_names_file_and_directory(tmp_path):
+    flat = write(tmp_path / 'alpha.txt')
+    nested = write(tmp_path / 'alpha' / 'context.txt')
+    names = fleet.assign_team_names([flat, nested])
+    assert names == {flat: 'alpha', nested: 'alpha_context'}
+
+
+def test_assign_team_names_unresolvable_collision(tmp_path):
+    a = write(tmp_path / 'a_b.txt')
+    b = write(tmp_path / 'a' / 'b.txt')
+    c = write(tmp_path / 'c' / 'b.txt')
+    with pytest.raises(ValueError):
+        fleet.assign_team_names([a, b, c])
+
+
+@pytest.mark.skipif(os.name == 'nt', reason='POSIX permissions')
+def test_write_report_atomic_sets_mode(tmp_path):
+    path = str(tmp_path / 'alpha.html')
+    fleet.write_report_atomic(path, '<p>hi</p>', 0o644)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '<p>hi</p>'
+    assert os.listdir(tmp_path) == ['alpha.html']
+
+    os.chmod(path, 0o640)
+    fleet.write_report_atomic(path, '<p>again</p>', 0o644)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
+
+
+def test_write_report_atomic_cleans_up_on_failure(tmp_path, monkeypatch):
+    path = str(tmp_path / 'alpha.html')
+
+    def fail(src, dst):
+        raise OSError('replace failed')
+
+    monkeypatch.setattr(fleet.os, 'replace', fail)
+    with pytest.raises(OSError):
+        fleet.write_report_atomic(path, '<p>hi</p>', 0o644)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture
+def in_process_parsing(monkeypatch):
+    # Lets tests patch parse_context_file without pickling it to a child process
+    monkeypatch.setattr(fleet, 'ProcessPoolExecutor', ThreadPoolExecutor)
+
+
+def run(context_files, output_dir, **kwargs):
+    return asyncio.run(fleet.run_fleet(context_files, str(output_dir), 'secret', 2, 1, False, **kwargs))
+
+
+def test_run_fleet_writes_reports_and_records_failures(tmp_path, monkeypatch, in_process_parsing):
+    ok = write(tmp_path / 'ok' / 'context.txt', 'good')
+    bad = write(tmp_path / 'bad' / 'context.txt', 'bad')
+    empty = write(tmp_path / 'empty' / 'context.txt', '  ')
+
+    def call(prompt, api_key, context, use_system_instruction=False, timeout=None):
+        assert use_system_instruction
+        if context == 'bad':
+            raise RuntimeError(f'429 quota for url: https://example.test/?key={api_key}')
+        return f'<p>{context}</p>'
+
+    monkeypatch.setattr(fleet, 'call_gemini_genai', call)
+    results = {r['team']: r for r in run([ok, bad, empty], tmp_path / 'out')}
+
+    assert results['ok']['error'] is None
+    with open(tmp_path / 'out' / 'ok.html', encoding='utf-8') as f:
+        assert f.read() == '<p>good</p>'
+    assert '429 quota' in results['bad']['error']
+    assert 'secret' not in results['bad']['error']
+    assert results['empty']['error'] == 'context file empty or unreadable'
+    assert sorted(os.listdir(tmp_path / 'out')) == ['ok.html']
+
+
+def test_run_fleet_records_parse_failures(tmp_path, monkeypatch, in_process_parsing):
+    ok = write(tmp_path / 'ok' / 'context.txt')
+    broken = write(tmp_path / 'broken' / 'context.txt')
+    real_parse = fleet.parse_context_file
+
+    def parse(context_file):
+        if context_file == broken:
+            raise RuntimeError('worker died')
+        return real_parse(context_file)
+
+    monkeypatch.setattr(fleet, 'parse_context_file', parse)
+    monkeypatch.setattr(fleet, 'call_gemini_genai', lambda *a, **k: '<p/>')
+    results = {r['team']: r for r in run([ok, broken], tmp_path / 'out')}
+
+    assert results['ok']['error'] is None
+    assert 'worker died' in results['broken']['error']
+
+
+def test_run_fleet_times_out_hung_requests(tmp_path, monkeypatch, in_process_parsing):
+    ok = write(tmp_path / 'ok' / 'context.txt', 'good')
+    hung = write(tmp_path / 'hung' / 'context.txt', 'hung')
+    release = threading.Event()
+
+    def call(prompt, api_key, context, use_system_instruction=False, timeout=None):
+        if context == 'hung':
+            release.wait(5)
+        return '<p/>'
+
+    monkeypatch.setattr(fleet, 'call_gemini_genai', call)
+    try:
+        results = {r['team']: r for r in run([ok, hung], tmp_path / 'out', request_timeout=0.2)}
+    finally:
+        release.set()
+
+    assert results['ok']['error'] is None
+    assert 'timed out' in results['hung']['error']
+
+
+def test_redact():
+    assert fleet.redact('GET /x?key=abc&alt=json failed', 'abc') == 'GET /x?key=***&alt=json failed'
+    assert fleet.redact('url ?key=other) failed', 'abc') == 'url ?key=***) failed'
+    assert fleet.redact('bad key AIzaSecret123', 'AIzaSecret123') == 'bad key ***'
+    assert fleet.redact('?key=k', 'k') == '?key=***'